@@ -15,8 +15,18 @@ Install deps:
   pip install pandas geoip2
 """
 import argparse
+import csv
+import functools
 import ipaddress
-from typing import Optional, Tuple
+import multiprocessing
+import os
+import re
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 try:
@@ -24,6 +34,15 @@ try:
 except Exception as e:
     raise SystemExit("Missing dependency 'geoip2'. Install with: pip install geoip2") from e
 
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+except Exception:
+    # Optional: pyarrow parses CSV in parallel across threads; without it we
+    # fall back to pandas' single-threaded C parser.
+    pa = None
+    pacsv = None
+
 
 def parse_args():
     p = argparse.ArgumentParser(description="Enrich CSV with a GeoIP column using local MaxMind DBs.")
@@ -37,6 +56,10 @@ def parse_args():
                    help="Name of the inserted GeoIP column (default: geoip)")
     p.add_argument("--chunksize", type=int, default=0,
                    help="Process CSV in chunks of this many rows (0 = load all at once)")
+    p.add_argument("--cache-size", type=int, default=100_000,
+                   help="Max number of distinct IPs to cache lookups for (default: 100000)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                   help="Threads for parallel GeoIP lookups (default: CPU count)")
     p.add_argument("--encoding", default="utf-8", help="CSV encoding (default: utf-8)")
     p.add_argument("--sep", default=",", help="CSV delimiter (default: ,)")
     p.add_argument("--quotechar", default='"', help='CSV quotechar (default: ")')
@@ -48,6 +71,11 @@ def parse_args():
     return p.parse_args()
 
 
+# Loose IPv4/IPv6 shape test, only for scoring candidate columns: exact
+# validation isn't needed to pick the most IP-looking column
+_IP_LIKE_RE = re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$|^(?=.*:)[0-9a-fA-F:.]+$")
+
+
 def autodetect_ip_col(df: pd.DataFrame) -> Optional[str]:
     common = ["ip", "ip_address", "client_ip", "source_ip", "src_ip", "dst_ip", "remote_ip"]
     for c in df.columns:
@@ -56,56 +84,144 @@ def autodetect_ip_col(df: pd.DataFrame) -> Optional[str]:
     # fallback: pick first column that looks like IPs in >50% of non-null rows
     sample = df.head(1000)
     for c in sample.columns:
-        vals = sample[c].dropna().astype(str).head(200).tolist()
-        if not vals:
+        vals = sample[c].dropna().astype(str).head(200).str.strip()
+        if vals.empty:
             continue
-        hits = 0
-        tot = 0
-        for v in vals:
-            tot += 1
-            try:
-                ipaddress.ip_address(v.strip())
-                hits += 1
-            except Exception:
-                pass
-        if tot and hits / tot >= 0.5:
+        hits = vals.str.match(_IP_LIKE_RE).sum()
+        if hits / len(vals) >= 0.5:
             return c
     return None
 
 
 def is_public_ip(s: str) -> bool:
+    """Scalar public-IP check; expects an already-stripped string."""
     try:
-        ip = ipaddress.ip_address(s.strip())
+        ip = ipaddress.ip_address(s)
         return not (ip.is_private or ip.is_loopback or ip.is_reserved or ip.is_link_local or ip.is_multicast)
     except Exception:
         return False
 
 
-def lookup(city_reader, asn_reader, ip: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[float], Optional[float], Optional[int], Optional[str]]:
+# IPv4 ranges that is_public_ip() rejects, as (network, netmask) uint32 pairs
+# for vectorized testing. Mirrors ipaddress' private/loopback/link-local/
+# multicast/reserved sets.
+_NONPUBLIC_V4_MASKS = [
+    (np.uint32(int(n.network_address)), np.uint32(int(n.netmask)))
+    for n in map(ipaddress.ip_network, (
+        "0.0.0.0/8", "10.0.0.0/8", "127.0.0.0/8", "169.254.0.0/16",
+        "172.16.0.0/12", "192.0.0.0/29", "192.0.0.170/31", "192.0.2.0/24",
+        "192.168.0.0/16", "198.18.0.0/15", "198.51.100.0/24",
+        "203.0.113.0/24", "224.0.0.0/4", "240.0.0.0/4",
+    ))
+]
+
+# First octets of the /8 blocks above that also contain public space and so
+# need the full per-range mask tests
+_AMBIGUOUS_OCTETS = np.array([169, 172, 192, 198, 203], dtype=np.uint32)
+
+
+def _ipv4_to_uint32(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized dotted-quad parse of a Series of already-stripped strings.
+    Returns (uint32 addresses, valid-IPv4 mask); non-IPv4 rows get 0 / False.
+    """
+    # Octets disallow leading zeros, matching ipaddress' parser
+    _oct = r"(0|[1-9]\d{0,2})"
+    parts = series.str.extract(r"^" + r"\.".join([_oct] * 4) + r"$")
+    nums = parts.to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(nums).any(axis=1)
+    nums = np.nan_to_num(nums, nan=256.0)
+    valid &= (nums <= 255).all(axis=1)
+    octets = nums.astype(np.uint32)
+    addrs = (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+    addrs[~valid] = 0
+    return addrs, valid
+
+
+def public_ip_mask(series: pd.Series) -> np.ndarray:
+    """
+    Vectorized is_public_ip over a Series of already-stripped strings.
+    Rows are routed by shape first: only values with exactly three dots and
+    no colon enter the uint32 fast lane, so IPv6 and garbage never drag the
+    whole array through the dotted-quad parse. The residual (IPv6,
+    v4-mapped-v6, anything odd) falls back to the scalar check per value.
+    """
+    public = np.zeros(len(series), dtype=bool)
+    looks_v4 = ((series.str.count(r"\.").to_numpy() == 3)
+                & ~series.str.contains(":", regex=False).to_numpy())
+    if looks_v4.any():
+        addrs, is_v4 = _ipv4_to_uint32(series[looks_v4])
+        first_octet = addrs >> np.uint32(24)
+        # First-octet triage: 0/8, 10/8, 127/8 and everything >= 224.0.0.0
+        # (multicast + reserved) are entirely non-public, so one compare per
+        # row settles them; only /8s that mix public and non-public space
+        # need the full per-range mask tests. Rows that fail the strict
+        # dotted-quad parse can't be valid IPv6 either, so they stay False.
+        pub4 = is_v4 & ~((first_octet == 0) | (first_octet == 10)
+                         | (first_octet == 127) | (first_octet >= 224))
+        ambiguous = np.nonzero(pub4 & np.isin(first_octet, _AMBIGUOUS_OCTETS))[0]
+        if ambiguous.size:
+            sub = addrs[ambiguous]
+            ok = np.ones(ambiguous.size, dtype=bool)
+            for net, mask in _NONPUBLIC_V4_MASKS:
+                ok &= (sub & mask) != net
+            pub4[ambiguous] = ok
+        public[looks_v4] = pub4
+    rest = np.nonzero(~looks_v4)[0]
+    if rest.size:
+        vals = series.to_numpy()
+        for i in rest:
+            public[i] = is_public_ip(vals[i])
+    return public
+
+
+def lookup(city_fn, asn_fn, ip: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[float], Optional[float], Optional[int], Optional[str]]:
     """
     Returns: (country_iso, region, city, lat, lon, asn, org)
+
+    `city_fn`/`asn_fn` are pre-bound Reader.city / Reader.asn methods
+    (asn_fn may be None), so the hot loop skips re-resolving them per call.
     """
     country_iso = region = city = org = None
     lat = lon = None
     asn = None
     try:
-        city_resp = city_reader.city(ip)
-        country_iso = getattr(getattr(city_resp, "country", None), "iso_code", None)
-        # region: prefer most specific subdivision name or ISO code
-        if city_resp.subdivisions and len(city_resp.subdivisions) > 0:
-            region = city_resp.subdivisions.most_specific.name or city_resp.subdivisions.most_specific.iso_code
-        city = getattr(getattr(city_resp, "city", None), "name", None)
-        if getattr(city_resp, "location", None):
-            lat = city_resp.location.latitude
-            lon = city_resp.location.longitude
+        city_resp = city_fn(ip)
     except Exception:
-        pass
+        city_resp = None
 
-    if asn_reader is not None:
+    # Direct attribute access beats getattr() chains; missing pieces of the
+    # response are rare, so let try/except handle them
+    if city_resp is not None:
         try:
-            asn_resp = asn_reader.asn(ip)
-            asn = getattr(asn_resp, "autonomous_system_number", None)
-            org = getattr(asn_resp, "autonomous_system_organization", None)
+            country_iso = city_resp.country.iso_code
+        except AttributeError:
+            pass
+        try:
+            # region: prefer most specific subdivision name or ISO code
+            subs = city_resp.subdivisions
+            if subs:
+                most_specific = subs.most_specific
+                region = most_specific.name or most_specific.iso_code
+        except (AttributeError, IndexError):
+            pass
+        try:
+            city = city_resp.city.name
+        except AttributeError:
+            pass
+        try:
+            loc = city_resp.location
+            if loc is not None:
+                lat = loc.latitude
+                lon = loc.longitude
+        except AttributeError:
+            pass
+
+    if asn_fn is not None:
+        try:
+            asn_resp = asn_fn(ip)
+            asn = asn_resp.autonomous_system_number
+            org = asn_resp.autonomous_system_organization
         except Exception:
             pass
 
@@ -118,50 +234,244 @@ def format_geoip(country_iso, region, city, lat, lon, asn, org) -> str:
     Example: 'US|Washington|Seattle|47.61|-122.33|AS15169|Google LLC'
     Missing fields are empty strings.
     """
-    parts = [
-        country_iso or "",
-        region or "",
-        city or "",
-        f"{lat:.6f}" if isinstance(lat, (float, int)) else "",
-        f"{lon:.6f}" if isinstance(lon, (float, int)) else "",
-        f"AS{asn}" if isinstance(asn, int) else "",
-        org or "",
-    ]
-    return "|".join(parts)
+    # Intern the text components: country codes, region/city names and org
+    # strings repeat across IPs, so duplicates collapse to one object each
+    return "|".join((
+        sys.intern(country_iso) if country_iso else "",
+        sys.intern(region) if region else "",
+        sys.intern(city) if city else "",
+        "" if lat is None else f"{lat:.6f}",
+        "" if lon is None else f"{lon:.6f}",
+        "" if asn is None else f"AS{asn}",
+        sys.intern(org) if org else "",
+    ))
 
 
-def enrich_dataframe(df: pd.DataFrame, ip_col: str, city_db: str, asn_db: Optional[str], geoip_col: str) -> pd.DataFrame:
+def _open_reader(path: str):
+    """
+    Open a GeoIP Reader, preferring the maxminddb C extension over mmap.
+    Falls back to the default (pure-Python) mode when the extension is
+    not installed.
+    """
     from geoip2.database import Reader
-    city_reader = Reader(city_db)
-    asn_reader = Reader(asn_db) if asn_db else None
+    import maxminddb
+    try:
+        return Reader(path, mode=maxminddb.MODE_MMAP_EXT)
+    except ValueError:
+        return Reader(path)
+
+
+def _ip_sort_key(s: str) -> bytes:
+    """Numeric sort key so nearby IPs land on nearby mmdb pages; IPv4 first."""
+    try:
+        return b"\x00" + socket.inet_aton(s)
+    except OSError:
+        return b"\x01" + s.encode("utf-8", "replace")
+
+
+def _make_cached_geoip(get_lookups: Callable, cache_size: int):
+    """
+    Build an LRU-cached ip -> geoip-string function. `get_lookups` returns a
+    (city_fn, asn_fn) pair of pre-bound Reader.city / Reader.asn methods and
+    may hand out per-thread ones.
+
+    Real logs repeat IPs heavily, and a cache hit is a dict probe versus a
+    full mmdb tree walk. Empty results (private/invalid IPs) are cached too,
+    so they don't re-hit the DB.
+    """
+    @functools.lru_cache(maxsize=cache_size)
+    def _cached_geoip(ip: str) -> str:
+        if not is_public_ip(ip):
+            return ""
+        city_fn, asn_fn = get_lookups()
+        c, r, ci, la, lo, an, og = lookup(city_fn, asn_fn, ip)
+        return format_geoip(c, r, ci, la, lo, an, og)
+
+    return _cached_geoip
+
+
+def enrich_dataframe(df: pd.DataFrame, ip_col: str, city_db: str, asn_db: Optional[str], geoip_col: str,
+                     cache_size: int = 100_000, workers: int = 1, copy: bool = False) -> pd.DataFrame:
+    # One Reader pair per thread: the maxminddb C extension releases the GIL
+    # during lookups, so threads scale, but sharing a reader would serialize
+    # on its internal state.
+    tl = threading.local()
+    opened = []
+    opened_lock = threading.Lock()
+
+    def _get_lookups():
+        lookups = getattr(tl, "lookups", None)
+        if lookups is None:
+            city_reader = _open_reader(city_db)
+            asn_reader = _open_reader(asn_db) if asn_db else None
+            with opened_lock:
+                opened.append((city_reader, asn_reader))
+            # Bind the lookup methods once per thread; the hot loop then
+            # calls plain locals instead of re-resolving attributes
+            lookups = (city_reader.city, asn_reader.asn if asn_reader else None)
+            tl.lookups = lookups
+        return lookups
+
+    _cached_geoip = _make_cached_geoip(_get_lookups, cache_size)
     try:
-        # Compute geoip values
-        def compute(ip_val: str) -> str:
-            if not isinstance(ip_val, str):
-                return ""
-            s = ip_val.strip()
-            if not s:
-                return ""
-            if not is_public_ip(s):
-                return ""
-            c, r, ci, la, lo, an, og = lookup(city_reader, asn_reader, s)
-            return format_geoip(c, r, ci, la, lo, an, og)
-
-        geo_series = df[ip_col].astype(str, errors="ignore").apply(compute)
-
-        # Insert the new column immediately to the right of the IP column
-        cols = list(df.columns)
-        ip_idx = cols.index(ip_col)
-        # Build new column order
-        new_cols = cols[: ip_idx + 1] + [geoip_col] + cols[ip_idx + 1 :]
-        # Construct new DataFrame
-        df_out = df.copy()
+        # Pre-filter public IPs with the vectorized mask, look up each distinct
+        # public IP once, then broadcast the results back: N rows usually
+        # share far fewer unique IPs.
+        # fillna guards the broadcast below: factorize codes missing values
+        # as -1, which would otherwise gather the wrong unique's result
+        ips = df[ip_col].astype(str).str.strip().fillna("")
+        public = public_ip_mask(ips)
+        # Drop to NumPy for the broadcast: factorize rows to integer codes,
+        # enrich each distinct IP once, then fan the results back out with a
+        # single fancy-indexing gather instead of per-element Series ops.
+        codes, uniques = pd.factorize(ips)
+        uniques = np.asarray(uniques, dtype=object)
+        # Sort uniques numerically so consecutive lookups walk adjacent mmdb
+        # pages instead of bouncing across the tree
+        uniq = sorted(uniques[np.unique(codes[public])], key=_ip_sort_key)
+        if workers > 1 and len(uniq) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                mapping = dict(zip(uniq, ex.map(_cached_geoip, uniq)))
+        else:
+            mapping = {ip: _cached_geoip(ip) for ip in uniq}
+        geo_uniques = np.array([mapping.get(u, "") for u in uniques], dtype=object)
+        # Distinct geoip strings are few; category stores one int code per row
+        # plus a small table instead of N duplicate strings
+        geo_series = pd.Categorical(geo_uniques[codes])
+
+        # Insert the new column immediately to the right of the IP column;
+        # insert() already places it in the right slot, so no copy or
+        # column reorder is needed
+        df_out = df.copy() if copy else df
+        ip_idx = list(df_out.columns).index(ip_col)
+        if pd.api.types.is_string_dtype(df_out[ip_col]) or pd.api.types.is_object_dtype(df_out[ip_col]):
+            # IPs repeat just as heavily; dedupe the source column too
+            df_out[ip_col] = df_out[ip_col].astype("category")
         df_out.insert(ip_idx + 1, geoip_col, geo_series)
-        return df_out[new_cols]
+        return df_out
     finally:
-        city_reader.close()
-        if asn_reader:
-            asn_reader.close()
+        _cached_geoip.cache_clear()
+        for city_reader, asn_reader in opened:
+            city_reader.close()
+            if asn_reader:
+                asn_reader.close()
+
+
+# Per-process state for the multiprocessing chunk workers; populated by
+# _init_chunk_worker so each worker opens its readers exactly once.
+_chunk_worker_geoip = None
+
+
+def _init_chunk_worker(city_db: str, asn_db: Optional[str], cache_size: int) -> None:
+    global _chunk_worker_geoip
+    city_reader = _open_reader(city_db)
+    asn_reader = _open_reader(asn_db) if asn_db else None
+    lookups = (city_reader.city, asn_reader.asn if asn_reader else None)
+    _chunk_worker_geoip = _make_cached_geoip(lambda: lookups, cache_size)
+
+
+def _enrich_rows(rows, ip_idx: int):
+    """Splice the geoip value into each row; runs in a pool worker."""
+    cached_geoip = _chunk_worker_geoip
+    out = []
+    for row in rows:
+        geo = cached_geoip((row[ip_idx] or "").strip()) if ip_idx < len(row) else ""
+        out.append(row[: ip_idx + 1] + [geo] + row[ip_idx + 1 :])
+    return out
+
+
+def enrich_csv_stream(args, out_path: str, ip_col: str) -> None:
+    """
+    Streaming path for large files: read and write row-by-row with the stdlib
+    csv module, splicing the geoip value in after the IP column. Avoids the
+    per-chunk DataFrame construction and copy entirely, so peak memory stays
+    flat regardless of input size. With --workers > 1, batches of rows are
+    enriched in a process pool while this process keeps reading and writing;
+    pool.imap preserves input order.
+    """
+    def _rows_stdlib():
+        with open(args.inp, newline="", encoding=args.encoding) as fin:
+            yield from csv.reader(fin, delimiter=args.sep, quotechar=args.quotechar)
+
+    def _rows_arrow():
+        # Read the header with the stdlib so every column can be pinned to
+        # string: values must round-trip to the output byte-for-byte.
+        with open(args.inp, newline="", encoding=args.encoding) as fin:
+            header = next(csv.reader(fin, delimiter=args.sep, quotechar=args.quotechar), None)
+        if header is None:
+            return
+        yield header
+        batches = pacsv.open_csv(
+            args.inp,
+            read_options=pacsv.ReadOptions(block_size=1 << 22, encoding=args.encoding),
+            parse_options=pacsv.ParseOptions(delimiter=args.sep, quote_char=args.quotechar),
+            convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in header}),
+        )
+        for batch in batches:
+            for row in zip(*(col.to_pylist() for col in batch.columns)):
+                yield list(row)
+
+    def _batches(rows, size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    rows = _rows_arrow() if pacsv is not None else _rows_stdlib()
+    # 1 MiB user-space buffer so row-by-row writes coalesce into few syscalls
+    with open(out_path, "w", buffering=1 << 20, newline="", encoding=args.encoding) as fout:
+        # LF line endings to match the whole-file writers; csv's default
+        # excel dialect would emit CRLF
+        writer = csv.writer(fout, delimiter=args.sep, quotechar=args.quotechar, lineterminator="\n")
+        header = next(rows, None)
+        if header is None:
+            return
+        try:
+            ip_idx = header.index(ip_col)
+        except ValueError:
+            raise SystemExit(f"IP column '{ip_col}' not found in input header.")
+        writer.writerow(header[: ip_idx + 1] + [args.geoip_col] + header[ip_idx + 1 :])
+
+        if args.workers > 1:
+            with multiprocessing.Pool(args.workers, initializer=_init_chunk_worker,
+                                      initargs=(args.city_db, args.asn_db, args.cache_size)) as pool:
+                enrich = functools.partial(_enrich_rows, ip_idx=ip_idx)
+                for out_rows in pool.imap(enrich, _batches(rows, args.chunksize)):
+                    writer.writerows(out_rows)
+        else:
+            city_reader = _open_reader(args.city_db)
+            asn_reader = _open_reader(args.asn_db) if args.asn_db else None
+            lookups = (city_reader.city, asn_reader.asn if asn_reader else None)
+            _cached_geoip = _make_cached_geoip(lambda: lookups, args.cache_size)
+            try:
+                for row in rows:
+                    geo = _cached_geoip((row[ip_idx] or "").strip()) if ip_idx < len(row) else ""
+                    writer.writerow(row[: ip_idx + 1] + [geo] + row[ip_idx + 1 :])
+            finally:
+                _cached_geoip.cache_clear()
+                city_reader.close()
+                if asn_reader:
+                    asn_reader.close()
+
+
+def _write_csv(df: pd.DataFrame, out_path: str, args) -> None:
+    """
+    Write the enriched frame, using Arrow's multi-threaded C writer when
+    pyarrow is available (UTF-8 only); otherwise pandas' to_csv.
+    """
+    if pacsv is not None and args.encoding.lower().replace("-", "") == "utf8":
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pacsv.write_csv(table, out_path, write_options=pacsv.WriteOptions(delimiter=args.sep))
+            return
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Frame contains something Arrow can't represent; use pandas
+            pass
+    df.to_csv(out_path, index=False, sep=args.sep, encoding=args.encoding)
 
 
 def process_all(args):
@@ -171,30 +481,39 @@ def process_all(args):
         read_kwargs["na_filter"] = False
 
     if args.chunksize and args.chunksize > 0:
-        # Stream in chunks
-        reader = pd.read_csv(args.inp, chunksize=args.chunksize, **read_kwargs)
-        first = True
-        detected_ip = None
-        for chunk in reader:
-            if args.ip_col:
-                ip_col = args.ip_col
-            else:
-                detected_ip = detected_ip or autodetect_ip_col(chunk)
-                if not detected_ip:
-                    raise SystemExit("Failed to auto-detect IP column. Specify --ip-col.")
-                ip_col = detected_ip
-            enriched = enrich_dataframe(chunk, ip_col, args.city_db, args.asn_db, args.geoip_col)
-            mode = "w" if first else "a"
-            header = first
-            enriched.to_csv(out_path, index=False, mode=mode, header=header, encoding=args.encoding)
-            first = False
+        # Stream row-by-row; detect the IP column from a small sample first
+        ip_col = args.ip_col
+        if not ip_col:
+            sample = pd.read_csv(args.inp, nrows=1000, **read_kwargs)
+            ip_col = autodetect_ip_col(sample)
+            if not ip_col:
+                raise SystemExit("Failed to auto-detect IP column. Specify --ip-col.")
+        enrich_csv_stream(args, out_path, ip_col)
     else:
-        df = pd.read_csv(args.inp, **read_kwargs)
+        if pacsv is not None:
+            # Arrow parses across threads and converts to pandas nearly free.
+            # Without --na-filter no text may be treated as missing, matching
+            # pandas' na_filter=False: Arrow's default null_values would
+            # otherwise swallow literal "NA"/"null" markers.
+            if args.na_filter:
+                convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+            else:
+                convert_options = pacsv.ConvertOptions(null_values=[])
+            table = pacsv.read_csv(
+                args.inp,
+                read_options=pacsv.ReadOptions(block_size=1 << 22, encoding=args.encoding),
+                parse_options=pacsv.ParseOptions(delimiter=args.sep, quote_char=args.quotechar),
+                convert_options=convert_options,
+            )
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            df = pd.read_csv(args.inp, **read_kwargs)
         ip_col = args.ip_col or autodetect_ip_col(df)
         if not ip_col:
             raise SystemExit("Failed to auto-detect IP column. Specify --ip-col.")
-        out_df = enrich_dataframe(df, ip_col, args.city_db, args.asn_db, args.geoip_col)
-        out_df.to_csv(out_path, index=False, encoding=args.encoding)
+        out_df = enrich_dataframe(df, ip_col, args.city_db, args.asn_db, args.geoip_col,
+                                  cache_size=args.cache_size, workers=args.workers)
+        _write_csv(out_df, out_path, args)
     print(f"Wrote: {out_path}")
 
 